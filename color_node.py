@@ -1,13 +1,14 @@
 import networkx as nx
 import matplotlib.pyplot as plt
-import pickle
+from matplotlib.collections import LineCollection
+import heapq
+from graph_io import load_graph
 import numpy as np
 
 # --- Load the Graph ---
 graph_filename = "nifty500_network.gpickle"
 try:
-    with open(graph_filename, 'rb') as f:
-        G = pickle.load(f)
+    G = load_graph(graph_filename)
     print(f"Successfully loaded graph from '{graph_filename}'")
 except FileNotFoundError:
     print(f"Error: File '{graph_filename}' not found.")
@@ -31,8 +32,8 @@ node_sizes = [((degrees[node]**2) * 5) + 50 for node in G_giant.nodes()]
 node_colors = [degrees[node] for node in G_giant.nodes()]
 
 # --- 3. Create Shells ---
-sorted_degrees = sorted(degrees.items(), key=lambda item: item[1], reverse=True)
-core_nodes = [node for node, degree in sorted_degrees[:10]]
+# Only the top 10 are needed, so a bounded heap beats sorting every node
+core_nodes = [node for node, degree in heapq.nlargest(10, degrees.items(), key=lambda item: item[1])]
 periphery_nodes = [node for node in G_giant.nodes() if node not in core_nodes]
 shells = [core_nodes, periphery_nodes]
 labels = {node: node if node in core_nodes else '' for node in G_giant.nodes()}
@@ -60,8 +61,11 @@ nx.draw_networkx_nodes(
     ax=ax # Tell it to draw on our axes
 )
 # Draw the edges
-# NEW CORRECTED LINE:
-nx.draw_networkx_edges(G_giant, pos, edge_color='grey', alpha=0.3, width=0.7, ax=ax)
+# All edges go into one LineCollection (a single artist) instead of one artist
+# per edge. zorder=1 keeps them underneath the nodes.
+edge_segments = np.array([(pos[u], pos[v]) for u, v in G_giant.edges()]).reshape(-1, 2, 2)
+edge_lines = LineCollection(edge_segments, colors='grey', alpha=0.3, linewidths=0.7, zorder=1)
+ax.add_collection(edge_lines)
 # Draw *only* the labels for the hubs
 nx.draw_networkx_labels(G_giant, pos, labels=labels, font_size=10, font_weight='bold', ax=ax)
 
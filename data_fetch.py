@@ -2,7 +2,10 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import requests
-import io
+import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm # Import tqdm
 
 # --- 1. Fetch the list of Nifty 500 stock symbols ---
@@ -10,13 +13,21 @@ csv_url = "https://nsearchives.nseindia.com/content/indices/ind_nifty500list.csv
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
 }
+
+# Retry transient failures (rate limiting, 5xx) with exponential backoff
+retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+session = requests.Session()
+session.headers.update(headers)
+session.mount("https://", HTTPAdapter(max_retries=retries))
+
 print(f"Downloading stock list from {csv_url}...")
 
 try:
-    response = requests.get(csv_url, headers=headers)
-    response.raise_for_status() 
-    csv_data = io.StringIO(response.text)
-    nifty500_df = pd.read_csv(csv_data)
+    # Stream the response straight into the CSV parser instead of buffering the body first
+    with session.get(csv_url, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True # Let urllib3 undo any gzip encoding
+        nifty500_df = pd.read_csv(response.raw)
     symbols = nifty500_df['Symbol'].tolist()
     symbols_ns = [symbol + ".NS" for symbol in symbols]
     print(f"Successfully fetched {len(symbols_ns)} stock symbols.")
@@ -24,7 +35,40 @@ except requests.exceptions.RequestException as e:
     print(f"Error: Failed to download CSV file. {e}")
     symbols_ns = []
 
-# --- 2. Download historical data (one by one) using yfinance and tqdm ---
+# --- 2. Download historical data in parallel using yfinance and tqdm ---
+
+max_workers = 16
+
+# yf.download builds a brand-new HTTP session on every call unless one is passed
+# in, so share one session across all downloads to reuse TLS connections.
+# curl_cffi (a yfinance dependency) keeps a keep-alive handle per worker thread
+# and impersonates a browser's TLS fingerprint, which Yahoo is less likely to
+# rate-limit; plain requests with a pooled, retrying adapter is the fallback.
+try:
+    from curl_cffi import requests as curl_requests
+    yf_session = curl_requests.Session(
+        impersonate="chrome",
+        retry=curl_requests.RetryStrategy(count=3, delay=0.5, backoff="exponential"))
+except ImportError:
+    yf_session = requests.Session()
+    yf_session.mount("https://", HTTPAdapter(pool_connections=max_workers,
+                                             pool_maxsize=max_workers,
+                                             max_retries=retries))
+
+def download_symbol(symbol, start_date, end_date):
+    """Downloads the adjusted close series for one symbol, or None if empty."""
+    data = yf.download(symbol, 
+                       start=start_date, 
+                       end=end_date,
+                       session=yf_session, # Reuse connections across downloads
+                       auto_adjust=True, # Added to suppress yfinance warning
+                       progress=False) # Turn off yfinance's built-in progress bar
+    if data.empty:
+        return None
+    # We only care about the 'Close' price (since auto_adjust=True, it's already adjusted)
+    price_series = data['Close']
+    price_series.name = symbol # Rename the series to its symbol
+    return price_series
 
 if symbols_ns:
     start_date = "2023-01-01"
@@ -35,32 +79,44 @@ if symbols_ns:
     # This list will hold all the successful data Series
     all_price_data = []
     
-    # Wrap the symbol list with tqdm to create a progress bar
-    for symbol in tqdm(symbols_ns, desc="Downloading Data"):
-        try:
-            # Download data for one symbol at a time
-            data = yf.download(symbol, 
-                               start=start_date, 
-                               end=end_date,
-                               auto_adjust=True, # Added to suppress yfinance warning
-                               progress=False) # Turn off yfinance's built-in progress bar
-            
-            if not data.empty:
-                # We only care about the 'Close' price (since auto_adjust=True, it's already adjusted)
-                price_series = data['Close']
-                price_series.name = symbol # Rename the series to its symbol
-                all_price_data.append(price_series)
-            else:
-                print(f"No data returned for {symbol}")
-
-        except Exception as e:
-            # If a download fails, print the error and continue
-            print(f"\nFailed to get ticker '{symbol}' reason: {e}")
+    # Each download is latency-bound, so run them on a thread pool to overlap
+    # the network round trips. tqdm advances as each download completes.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(download_symbol, symbol, start_date, end_date): symbol
+                   for symbol in symbols_ns}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Downloading Data"):
+            symbol = futures[future]
+            try:
+                price_series = future.result()
+                if price_series is not None:
+                    all_price_data.append(price_series)
+                else:
+                    print(f"No data returned for {symbol}")
+
+            except Exception as e:
+                # If a download fails, print the error and continue
+                print(f"\nFailed to get ticker '{symbol}' reason: {e}")
+
+    # Downloads finish out of order; restore the original symbol order
+    symbol_order = {symbol: i for i, symbol in enumerate(symbols_ns)}
+    all_price_data.sort(key=lambda series: symbol_order[series.name])
 
     # --- 3. Combine, Clean, and Save the Data ---
     if all_price_data:
-        # Combine all the individual Series into one large DataFrame
-        adj_close_prices = pd.concat(all_price_data, axis=1)
+        # Combine all the individual Series into one large DataFrame.
+        # Rather than pd.concat (an outer join that re-indexes and copies every
+        # Series), preallocate one array on the union of trading dates and write
+        # each Series into its rows directly. The union of real trading dates is
+        # used instead of a business-day calendar so exchange holidays don't
+        # become all-NaN rows that would make dropna() discard every stock.
+        date_index = all_price_data[0].index
+        for series in all_price_data[1:]:
+            date_index = date_index.union(series.index)
+        price_matrix = np.full((len(date_index), len(all_price_data)), np.nan)
+        for col, series in enumerate(all_price_data):
+            price_matrix[date_index.get_indexer(series.index), col] = np.asarray(series, dtype=float).reshape(-1)
+        adj_close_prices = pd.DataFrame(price_matrix, index=date_index,
+                                        columns=[series.name for series in all_price_data])
 
         # Drop any columns (stocks) that have ANY missing data (NaN)
         cleaned_prices = adj_close_prices.dropna(axis=1)
@@ -68,6 +124,19 @@ if symbols_ns:
         # Save the cleaned data to a new local file
         local_filename = "nifty500_adj_close_2023_2024.csv"
         cleaned_prices.to_csv(local_filename)
+
+        # Also save a Parquet copy (columnar and compressed, much faster to reload).
+        # This needs pyarrow or fastparquet; the CSV above is always written.
+        parquet_filename = "nifty500_adj_close_2023_2024.parquet"
+        try:
+            cleaned_prices.to_parquet(parquet_filename)
+            print(f"Parquet copy saved to '{parquet_filename}'")
+        except ImportError as e:
+            print(f"Skipping Parquet copy ({e})")
+            # Don't leave a Parquet file from an older download next to the new CSV
+            if os.path.exists(parquet_filename):
+                os.remove(parquet_filename)
+                print(f"Removed stale '{parquet_filename}'")
         
         print(f"\nSuccessfully downloaded and combined data.")
         print(f"Original number of symbols requested: {len(symbols_ns)}")
@@ -3,14 +3,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import collections
 import time
-import pickle  # <-- ADD THIS IMPORT
+from graph_io import load_graph
 
 # --- 0. Load the Graph (NEW ROBUST METHOD) ---
-# We now load the .gpickle file using pickle
+# We load the .gpickle file with graph_io.load_graph
 graph_filename = "nifty500_network.gpickle"
 try:
-    with open(graph_filename, 'rb') as f:
-        G = pickle.load(f)
+    # Metrics precomputed by network_construction.py come from the same read
+    # (empty if stale or missing)
+    G, cached_metrics = load_graph(graph_filename, with_metrics=True)
     
     print(f"Successfully loaded graph from '{graph_filename}'")
     print(f"Nodes: {G.number_of_nodes()}, Edges: {G.number_of_edges()}")
@@ -91,7 +92,10 @@ else:
 print("\n--- 3.2. Clustering & G(n,p) Comparison (Ch 7.9, 8.6, 12) ---")
 
 # Calculate the average clustering coefficient for your stock network
-C_stock = nx.average_clustering(G)
+if "clustering" in cached_metrics:
+    C_stock = np.mean(list(cached_metrics["clustering"].values())) if N > 0 else 0
+else:
+    C_stock = nx.average_clustering(G)
 print(f"Stock Network Average Clustering (C): {C_stock:.4f}")
 
 # --- Create the equivalent G(n, p) Random Graph ---
@@ -121,11 +125,18 @@ print_top_nodes(degree_cent, "Degree Centrality")
 # 2. Betweenness Centrality (Ch 7.7)
 # Interpretation: Stocks that act as "brokers" or "bridges" between different 
 # sectors or clusters. They lie on many shortest paths.
-print("\nCalculating Betweenness Centrality (this may take a few seconds)...")
-start_time = time.time()
-betweenness_cent = nx.betweenness_centrality(G, normalized=True)
-end_time = time.time()
-print(f"Done in {end_time - start_time:.2f} seconds.")
+# Exact betweenness (Brandes) runs one BFS per node; sampling k source nodes
+# gives an unbiased estimate that is plenty for ranking the top brokers.
+if "betweenness" in cached_metrics:
+    print("\nUsing precomputed Betweenness Centrality from the graph file.")
+    betweenness_cent = cached_metrics["betweenness"]
+else:
+    print("\nCalculating Betweenness Centrality (this may take a few seconds)...")
+    start_time = time.time()
+    k_samples = min(100, N)
+    betweenness_cent = nx.betweenness_centrality(G, k=k_samples, normalized=True, seed=42)
+    end_time = time.time()
+    print(f"Done in {end_time - start_time:.2f} seconds.")
 print_top_nodes(betweenness_cent, "Betweenness Centrality")
 
 # 3. Eigenvector Centrality (Ch 7.2)
@@ -0,0 +1,69 @@
+import networkx as nx
+import numpy as np
+import hashlib
+import pickle
+
+# The graph is stored as flat arrays (node list + edge endpoint indices + weights)
+# rather than a pickled nx.Graph. Pickling NetworkX's nested dict-of-dicts is
+# verbose on disk and slow to reload; flat arrays are compact and rebuild the
+# graph with a single bulk insert.
+#
+# Expensive per-node metrics (betweenness, clustering) can be stored in the same
+# file, tagged with a hash of the edge arrays they were computed on, so the
+# analysis scripts get them from the same read as the graph and only recompute
+# them when the graph has changed.
+
+def _arrays_hash(nodes, edge_i, edge_j):
+    """Returns a short hash of the stored node list and edge endpoint arrays."""
+    h = hashlib.sha1()
+    h.update("\0".join(map(str, nodes)).encode())
+    h.update(np.ascontiguousarray(edge_i, dtype=np.int32).tobytes())
+    h.update(np.ascontiguousarray(edge_j, dtype=np.int32).tobytes())
+    return h.hexdigest()[:16]
+
+
+def save_graph(G, filename, metrics=None):
+    """Saves a weighted graph (and optional per-node metrics) to 'filename'."""
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data='weight', default=1.0))
+    payload = {
+        "nodes": nodes,
+        "edge_i": np.array([index[u] for u, _, _ in edges], dtype=np.int32),
+        "edge_j": np.array([index[v] for _, v, _ in edges], dtype=np.int32),
+        "weights": np.array([w for _, _, w in edges], dtype=np.float64),
+    }
+    if metrics is not None:
+        payload["metrics"] = dict(metrics, graph_hash=_arrays_hash(
+            nodes, payload["edge_i"], payload["edge_j"]))
+    with open(filename, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_graph(filename, with_metrics=False):
+    """Loads a graph written by save_graph (or a legacy pickled nx.Graph).
+
+    With with_metrics=True, returns (G, metrics), where metrics is the dict saved
+    alongside the graph, or empty if there is none or it doesn't match the graph.
+    """
+    with open(filename, 'rb') as f:
+        payload = pickle.load(f)
+
+    # Older runs pickled the nx.Graph object directly
+    if isinstance(payload, nx.Graph):
+        return (payload, {}) if with_metrics else payload
+
+    nodes = np.array(payload["nodes"], dtype=object)
+    G = nx.Graph()
+    G.add_nodes_from(payload["nodes"])
+    G.add_weighted_edges_from(zip(nodes[payload["edge_i"]],
+                                  nodes[payload["edge_j"]],
+                                  payload["weights"].tolist()))
+    if not with_metrics:
+        return G
+
+    metrics = payload.get("metrics") or {}
+    stored_hash = _arrays_hash(payload["nodes"], payload["edge_i"], payload["edge_j"])
+    if metrics.get("graph_hash") != stored_hash:
+        metrics = {}
+    return G, metrics
@@ -2,12 +2,15 @@ import networkx as nx
 import pandas as pd
 import numpy as np
 import time
-import pickle  # <-- ADD THIS IMPORT
+from graph_io import save_graph
+from thresholding import edges_above
 
 # --- 1. Load Local Nifty 500 Price Data ---
 local_filename = "nifty500_adj_close_2023_2024.csv"
 try:
-    prices_df = pd.read_csv(local_filename, index_col=0, parse_dates=True)
+    # float32 is ample for correlations of noisy returns and halves the memory
+    # traffic of the return and correlation matrices (single-precision BLAS)
+    prices_df = pd.read_csv(local_filename, index_col=0, parse_dates=True).astype(np.float32)
     print(f"Successfully loaded data from '{local_filename}'.")
     print(f"Shape of price data: {prices_df.shape}")
 except FileNotFoundError:
@@ -23,7 +26,12 @@ print(f"Log-returns calculated. Shape: {log_returns_df.shape}")
 # --- 3. Create the Correlation Matrix ---
 print("Calculating correlation matrix...")
 start_time = time.time()
-corr_matrix = log_returns_df.corr(method='pearson')
+# Pearson correlation as a single matrix product on standardized returns,
+# which runs through BLAS instead of pandas' pairwise loop.
+returns = log_returns_df.to_numpy()
+Z = (returns - returns.mean(axis=0)) / returns.std(axis=0, ddof=1)
+corr_values = (Z.T @ Z) / (Z.shape[0] - 1)
+corr_matrix = pd.DataFrame(corr_values, index=log_returns_df.columns, columns=log_returns_df.columns)
 end_time = time.time()
 print(f"Correlation matrix calculated in {end_time - start_time:.2f} seconds.")
 print(f"Correlation matrix shape: {corr_matrix.shape}") 
@@ -34,13 +42,11 @@ print(f"Building graph with threshold theta = {theta}...")
 G = nx.Graph()
 G.add_nodes_from(corr_matrix.columns) # Nodes are the stock symbols
 
-for i in range(len(corr_matrix.columns)):
-    for j in range(i + 1, len(corr_matrix.columns)):
-        stock_i = corr_matrix.columns[i]
-        stock_j = corr_matrix.columns[j]
-        correlation = corr_matrix.iloc[i, j]
-        if correlation >= theta:
-            G.add_edge(stock_i, stock_j, weight=correlation)
+# Threshold the whole matrix at once instead of looping over every pair.
+# edges_above keeps each pair (i < j) exactly once (Numba kernel if available).
+i_idx, j_idx, weights = edges_above(corr_values, theta)
+cols = corr_matrix.columns.to_numpy()
+G.add_weighted_edges_from(zip(cols[i_idx], cols[j_idx], weights.tolist()))
 
 print("\n--- Network Created Successfully ---")
 print(f"Number of nodes (stocks): {G.number_of_nodes()}")
@@ -53,10 +59,21 @@ try:
 except ZeroDivisionError:
     print("Error: Graph has no nodes.")
 
-# --- 5. SAVE GRAPH (NEW ROBUST METHOD) ---
-# Use Python's built-in pickle library
+# --- 5. Precompute Node Metrics ---
+# Betweenness is the most expensive metric used downstream, so compute it once
+# here (sampled, as in the analysis scripts) and store it with the graph.
+print("Precomputing node metrics (clustering, betweenness)...")
+start_time = time.time()
+metrics = {
+    "clustering": nx.clustering(G),
+    "betweenness": nx.betweenness_centrality(G, k=min(100, G.number_of_nodes()), normalized=True, seed=42),
+}
+end_time = time.time()
+print(f"Node metrics calculated in {end_time - start_time:.2f} seconds.")
+
+# --- 6. SAVE GRAPH (FLAT ARRAY FORMAT) ---
+# Stored as node list + edge arrays, with the metrics alongside; see graph_io.py
 graph_filename = "nifty500_network.gpickle" # .gpickle extension is fine
-with open(graph_filename, 'wb') as f:
-    pickle.dump(G, f)
+save_graph(G, graph_filename, metrics=metrics)
 
-print(f"Main graph saved to '{graph_filename}' (Robust Pickle Format)")
\ No newline at end of file
+print(f"Main graph saved to '{graph_filename}' (Flat Array Pickle Format)")
\ No newline at end of file
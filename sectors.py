@@ -1,9 +1,19 @@
 import networkx as nx
 import pandas as pd
 import numpy as np
-import pickle
+from graph_io import load_graph
 import requests
-import io
+import argparse
+
+# --- 0. Command-Line Options ---
+# Report formatting and the (expensive) betweenness centrality are opt-in, so
+# batch runs only do the work they need.
+parser = argparse.ArgumentParser(description="Analyze Nifty 500 network properties by sector.")
+parser.add_argument('--report', choices=['none', 'csv', 'latex', 'all'], default='csv',
+                    help="Which report to emit: printed table + CSV, LaTeX table, both, or nothing (default: csv)")
+parser.add_argument('--betweenness', action='store_true',
+                    help="Also compute the per-sector average betweenness centrality")
+args = parser.parse_args()
 
 # --- 1. Load Stock-to-Sector Mapping ---
 csv_url = "https://nsearchives.nseindia.com/content/indices/ind_nifty500list.csv"
@@ -12,10 +22,11 @@ headers = {
 }
 print("Loading sector information...")
 try:
-    response = requests.get(csv_url, headers=headers)
-    response.raise_for_status() 
-    csv_data = io.StringIO(response.text)
-    nifty500_df = pd.read_csv(csv_data)
+    # Stream the response straight into the CSV parser instead of buffering the body first
+    with requests.get(csv_url, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True # Let urllib3 undo any gzip encoding
+        nifty500_df = pd.read_csv(response.raw)
     
     # Create a simple dictionary to map Symbol -> Industry
     # We add .NS to the symbol to match our graph nodes
@@ -31,73 +42,76 @@ except Exception as e:
 # --- 2. Load the Graph ---
 graph_filename = "nifty500_network.gpickle"
 try:
-    with open(graph_filename, 'rb') as f:
-        G = pickle.load(f)
+    G, cached_metrics = load_graph(graph_filename, with_metrics=True) # Metrics empty if stale or missing
     print(f"Successfully loaded graph from '{graph_filename}'")
 except FileNotFoundError:
     print(f"Error: File '{graph_filename}' not found.")
     exit()
 
 # --- 3. Assign Sector Attribute to Nodes ---
-# We assign the 'industry' as an attribute to each node in the graph
-for node in G.nodes():
-    G.nodes[node]['industry'] = sector_map.get(node, 'Unknown') # Using 'industry'
+# We assign the 'industry' as an attribute to each node in the graph (in one bulk call)
+industry_by_node = {node: sector_map.get(node, 'Unknown') for node in G.nodes()}
+nx.set_node_attributes(G, industry_by_node, name='industry') # Using 'industry'
 
 # --- 4. Calculate Metrics per Sector ---
 print("Analyzing network properties by sector...")
-# Get all unique industry names
-industries = set(nx.get_node_attributes(G, 'industry').values())
-sector_analysis = []
-
 # Get centralities for all nodes at once
-degrees = dict(G.degree())
-clustering = nx.clustering(G)
-betweenness = nx.betweenness_centrality(G, normalized=True)
+# Degree and clustering come from one sparse (CSR) adjacency matrix instead of
+# walking NetworkX's dict-of-dicts. For an unweighted graph, diag(A^3) counts
+# each triangle through a node twice, so C_v = diag(A^3)_v / (k_v * (k_v - 1)).
+nodes = list(G.nodes())
+A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, format='csr')
+deg = np.asarray(A.sum(axis=1)).ravel()
+closed_walks = np.asarray((A @ A).multiply(A).sum(axis=1)).ravel() # diag(A^3) without forming A^3
+with np.errstate(divide='ignore', invalid='ignore'):
+    clu = np.where(deg > 1, closed_walks / (deg * (deg - 1)), 0.0)
 
-for industry in sorted(list(industries)):
-    if industry == 'Unknown': continue # Skip unknown
-    
-    # Find all nodes belonging to this industry
-    sector_nodes = [node for node, data in G.nodes(data=True) if data.get('industry') == industry]
-    
-    if not sector_nodes:
-        continue
-    
-    # Calculate properties
-    num_nodes = len(sector_nodes)
-    avg_degree = np.mean([degrees[n] for n in sector_nodes])
-    avg_clustering = np.mean([clustering[n] for n in sector_nodes])
-    avg_betweenness = np.mean([betweenness[n] for n in sector_nodes])
-    
-    sector_analysis.append({
-        "Industry": industry, # Renamed column for clarity
-        "Num Stocks": num_nodes,
-        "Avg. Degree": avg_degree,
-        "Avg. Clustering": avg_clustering,
-        "Avg. Betweenness": avg_betweenness
-    })
+# Aggregate every sector in one groupby over a per-node table
+node_df = pd.DataFrame({
+    "Industry": [industry_by_node[n] for n in nodes],
+    "Degree": deg,
+    "Clustering": clu,
+})
+aggregations = {
+    "Num Stocks": ("Degree", "size"),
+    "Avg. Degree": ("Degree", "mean"),
+    "Avg. Clustering": ("Clustering", "mean"),
+}
+
+if args.betweenness:
+    # Reuse the betweenness saved by network_construction.py when it matches this graph;
+    # otherwise sample k source nodes instead of running exact Brandes from every node
+    betweenness = cached_metrics.get("betweenness")
+    if betweenness is None:
+        betweenness = nx.betweenness_centrality(G, k=min(100, G.number_of_nodes()), normalized=True, seed=42)
+    node_df["Betweenness"] = [betweenness[n] for n in nodes]
+    aggregations["Avg. Betweenness"] = ("Betweenness", "mean")
+
+node_df = node_df[node_df["Industry"] != 'Unknown'] # Skip unknown
 
 # --- 5. Display Results as a DataFrame ---
-results_df = pd.DataFrame(sector_analysis)
+results_df = node_df.groupby("Industry", sort=True).agg(**aggregations).reset_index()
 
 # Check if the DataFrame is empty before trying to sort it
 if not results_df.empty:
     results_df = results_df.sort_values(by="Avg. Degree", ascending=False)
 
-    # Set pandas to display all rows and formatted floats
-    pd.set_option('display.max_rows', None)
-    pd.set_option('display.precision', 4)
+    if args.report in ('csv', 'all'):
+        # Set pandas to display all rows and formatted floats
+        pd.set_option('display.max_rows', None)
+        pd.set_option('display.precision', 4)
 
-    print("\n--- Network Analysis by Sector (at θ=0.5) ---")
-    print(results_df)
+        print("\n--- Network Analysis by Sector (at θ=0.5) ---")
+        print(results_df)
 
-    # You can save this table to a file
-    results_df.to_csv("sector_analysis.csv")
-    print("\nResults saved to 'sector_analysis.csv'")
+        # You can save this table to a file
+        results_df.to_csv("sector_analysis.csv")
+        print("\nResults saved to 'sector_analysis.csv'")
 
-    # Example of how to get the LaTeX code for your report
-    print("\n--- LaTeX Code for Report Table ---")
-    print(results_df.to_latex(index=False, float_format="%.4f"))
+    if args.report in ('latex', 'all'):
+        # Example of how to get the LaTeX code for your report
+        print("\n--- LaTeX Code for Report Table ---")
+        print(results_df.to_latex(index=False, float_format="%.4f"))
 else:
     print("\nError: No sector data was found. The analysis table is empty.")
     print("This might happen if none of the stocks in your graph were in the Nifty 500 list.")
\ No newline at end of file
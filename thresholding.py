@@ -0,0 +1,45 @@
+import numpy as np
+import importlib.util
+
+# Numba is optional: with it, the pairwise threshold scan for large matrices runs
+# as a parallel compiled kernel (no temporary N x N boolean mask, see
+# thresholding_numba.py); otherwise the NumPy version below is used. Both return
+# the same (i, j, weight) arrays, ordered row by row with i < j.
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None
+
+# Importing numba and loading the cached kernel costs ~0.45 s per process, while
+# the NumPy scan takes ~1 ms at N = 500 and the kernel only saves ~2.2e-9 * N^2 s
+# (single-core benchmark), so it only pays off for N around 15k and up.
+NUMBA_MIN_N = 15000
+
+
+def _edges_above_numpy(corr, theta, chunk_rows=None):
+    """Upper-triangle pairs with corr >= theta, via boolean masks over row blocks."""
+    N = corr.shape[0]
+    if chunk_rows is None:
+        # Bound each temporary mask to about 4M entries regardless of N
+        chunk_rows = max(1, (1 << 22) // max(N, 1))
+
+    i_parts, j_parts = [], []
+    for r0 in range(0, N, chunk_rows):
+        block = corr[r0:r0 + chunk_rows]
+        # k = r0 + 1 keeps only columns j > i for the block's global row index i
+        i_local, j = np.nonzero(np.triu(block >= theta, k=r0 + 1))
+        i_parts.append(i_local + r0)
+        j_parts.append(j)
+
+    if not i_parts:
+        i_idx = j_idx = np.empty(0, dtype=np.int64)
+    else:
+        i_idx = np.concatenate(i_parts)
+        j_idx = np.concatenate(j_parts)
+    return i_idx, j_idx, corr[i_idx, j_idx]
+
+
+def edges_above(corr, theta):
+    """Returns (i_idx, j_idx, weights) for all pairs i < j with corr[i, j] >= theta."""
+    corr = np.ascontiguousarray(corr)
+    if HAVE_NUMBA and corr.shape[0] >= NUMBA_MIN_N:
+        from thresholding_numba import edges_above_numba
+        return edges_above_numba(corr, float(theta))
+    return _edges_above_numpy(corr, theta)
@@ -0,0 +1,42 @@
+import numpy as np
+from numba import njit, prange
+
+# Compiled kernel behind thresholding.edges_above. Kept in its own module so that
+# numba is only imported (and the kernel only loaded) for matrices large enough
+# to amortize that cost; see thresholding.NUMBA_MIN_N.
+
+
+@njit(parallel=True, cache=True)
+def edges_above_numba(corr, theta):
+    """Upper-triangle pairs with corr >= theta, via a two-pass parallel scan."""
+    N = corr.shape[0]
+
+    # Pass 1: count the qualifying pairs in each row
+    counts = np.zeros(N, np.int64)
+    for i in prange(N):
+        c = 0
+        for j in range(i + 1, N):
+            if corr[i, j] >= theta:
+                c += 1
+        counts[i] = c
+
+    # Prefix sum gives each row its slice of the output arrays
+    offsets = np.zeros(N + 1, np.int64)
+    for i in range(N):
+        offsets[i + 1] = offsets[i] + counts[i]
+    total = offsets[N]
+
+    i_idx = np.empty(total, np.int64)
+    j_idx = np.empty(total, np.int64)
+    weights = np.empty(total, corr.dtype)
+
+    # Pass 2: fill each row's slice independently
+    for i in prange(N):
+        k = offsets[i]
+        for j in range(i + 1, N):
+            if corr[i, j] >= theta:
+                i_idx[k] = i
+                j_idx[k] = j
+                weights[k] = corr[i, j]
+                k += 1
+    return i_idx, j_idx, weights